@@ -0,0 +1,47 @@
+# cython: language_level=3
+"""Optional Cython build of the analyzer's $ref walker.
+
+Build in place with ``cythonize -i _refwalk.pyx``; analyzer.py falls back to
+its pure-Python walker when this module is not compiled.
+"""
+
+from cpython.dict cimport PyDict_Next
+from cpython.ref cimport PyObject
+
+
+def count_refs(object root, set known_refs, set refs_found):
+    """
+    Count $ref usage below a node, recording which known targets are referenced.
+    
+    Args:
+        root: Spec node to walk
+        known_refs: Component references defined by the spec
+        refs_found: Set the referenced known targets are added to
+        
+    Returns:
+        Number of $ref occurrences found
+    """
+    cdef Py_ssize_t total_refs = 0
+    cdef Py_ssize_t pos
+    cdef PyObject *key
+    cdef PyObject *value
+    cdef list stack = [root]
+    cdef object obj
+    cdef object ref
+    
+    while stack:
+        obj = stack.pop()
+        if type(obj) is dict:
+            ref = (<dict>obj).get('$ref')
+            if ref is not None:
+                if ref in known_refs:
+                    refs_found.add(ref)
+                total_refs += 1
+                continue
+            pos = 0
+            while PyDict_Next(obj, &pos, &key, &value):
+                stack.append(<object>value)
+        elif type(obj) is list:
+            stack.extend(<list>obj)
+    
+    return total_refs
@@ -1,13 +1,216 @@
 """OpenAPI specification analyzer module."""
 
+import functools
 import json
+import sys
+from itertools import chain
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set
-from collections import defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from collections import Counter
 import logging
 
 from core import SpecLoader, OperationCounter, ComponentExtractor, validate_spec_structure, logger
 
+try:
+    import ijson
+except ImportError:  # optional streaming parser, only needed for stream_paths_analysis
+    ijson = None
+
+
+def _count_refs(root: Any, known_refs: Set[str], refs_found: Set[str]) -> int:
+    """
+    Count $ref usage below a node, recording which known targets are referenced.
+    
+    Uses an explicit stack so deeply nested specs don't hit the recursion limit.
+    
+    Args:
+        root: Spec node to walk
+        known_refs: Component references defined by the spec
+        refs_found: Set the referenced known targets are added to
+        
+    Returns:
+        Number of $ref occurrences found
+    """
+    # Parsed specs only contain plain dicts and lists, so exact type identity
+    # checks are enough and skip isinstance's subclass handling
+    dict_t = dict
+    list_t = list
+    total_refs = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        t = type(obj)
+        if t is dict_t:
+            ref = obj.get('$ref')
+            if ref is not None:
+                if ref in known_refs:
+                    refs_found.add(ref)
+                total_refs += 1
+                continue
+            stack.extend(obj.values())
+        elif t is list_t:
+            stack.extend(obj)
+    return total_refs
+
+
+try:
+    # Compiled walker for very large specs, see _refwalk.pyx
+    from _refwalk import count_refs as _count_refs
+except ImportError:
+    pass
+
+
+def _memoized(method):
+    """
+    Cache a private analyzer method's result on the instance, keyed by method name.
+    
+    Only used for internal passes whose results are never handed to callers,
+    since the cached object itself is returned on every call.
+    """
+    name = method.__name__
+    
+    @functools.wraps(method)
+    def wrapper(self):
+        cache = self._cache
+        if name not in cache:
+            cache[name] = method(self)
+        return cache[name]
+    
+    return wrapper
+
+
+def _scan_paths(path_items: Iterable[Tuple[str, Any]], component_refs: Optional[Set[str]],
+                has_global_security: bool) -> Dict[str, Any]:
+    """
+    Gather path, operation, tag, security and reference counters in one pass.
+    
+    Args:
+        path_items: (path, path item) pairs to scan
+        component_refs: Known component references, or None to skip $ref counting
+        has_global_security: Whether the spec defines global security requirements
+        
+    Returns:
+        Dictionary with the raw counters
+    """
+    methods = OperationCounter.HTTP_METHODS_SET
+    
+    method_counts = {method: 0 for method in OperationCounter.HTTP_METHODS}
+    total_paths = 0
+    total_operations = 0
+    path_bases = []
+    depth_sum = 0
+    depth_max = 0
+    parameterized_paths = 0
+    paths_without_operations = 0
+    used_tags = Counter()
+    total_tag_uses = 0
+    untagged_operations = 0
+    operations_with_security = 0
+    operations_without_security = 0
+    refs_used = set()
+    total_refs = 0
+    
+    for path, path_item in path_items:
+        total_paths += 1
+        
+        # Count path parameters
+        if '{' in path:
+            parameterized_paths += 1
+        
+        # Analyze path depth (a trailing slash doesn't add a segment)
+        depth = path.count('/') - path.endswith('/')
+        depth_sum += depth
+        if depth > depth_max:
+            depth_max = depth
+        
+        # Extract base pattern, the first segment after the leading slash
+        first_slash = path.find('/', 1)
+        path_bases.append(path[1:first_slash] if first_slash > 0 else path[1:] or 'root')
+        
+        # Count references while the path item is at hand
+        if component_refs is not None:
+            total_refs += _count_refs(path_item, component_refs, refs_used)
+        
+        if not isinstance(path_item, dict):
+            continue
+        
+        # Path items without any operation need no further work
+        if methods.isdisjoint(path_item):
+            paths_without_operations += 1
+            continue
+        
+        # Iterate the keys actually present rather than probing every method
+        for method, operation in path_item.items():
+            if method not in methods:
+                continue
+            
+            method_counts[method] += 1
+            total_operations += 1
+            
+            if not isinstance(operation, dict):
+                continue
+            
+            tags = operation.get('tags')
+            if tags:
+                used_tags.update(tags)
+                total_tag_uses += len(tags)
+            else:
+                untagged_operations += 1
+            
+            if 'security' in operation or has_global_security:
+                operations_with_security += 1
+            else:
+                operations_without_security += 1
+    
+    # Tally base patterns in one C-level pass
+    path_patterns = Counter(path_bases)
+    
+    return {
+        'total_paths': total_paths,
+        'method_counts': method_counts,
+        'total_operations': total_operations,
+        'path_patterns': path_patterns,
+        'depth_sum': depth_sum,
+        'depth_max': depth_max,
+        'parameterized_paths': parameterized_paths,
+        'paths_without_operations': paths_without_operations,
+        'used_tags': used_tags,
+        'total_tag_uses': total_tag_uses,
+        'untagged_operations': untagged_operations,
+        'operations_with_security': operations_with_security,
+        'operations_without_security': operations_without_security,
+        'refs_used': refs_used,
+        'total_refs': total_refs
+    }
+
+
+def _summarize_paths(collected: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the path analysis section from the scanned counters.
+    
+    Args:
+        collected: Counters returned by _scan_paths
+        
+    Returns:
+        Dictionary with path analysis results
+    """
+    total_paths = collected['total_paths']
+    
+    return {
+        'total_paths': total_paths,
+        'total_operations': collected['total_operations'],
+        'operations_by_method': {
+            method: count 
+            for method, count in collected['method_counts'].items() 
+            if count > 0
+        },
+        'parameterized_paths': collected['parameterized_paths'],
+        'average_path_depth': collected['depth_sum'] / total_paths if total_paths else 0,
+        'max_path_depth': collected['depth_max'],
+        'path_patterns': dict(collected['path_patterns']),
+        'paths_without_operations': collected['paths_without_operations']
+    }
+
 
 class OpenAPIAnalyzer:
     """Analyze OpenAPI specifications for structure, complexity, and quality."""
@@ -27,6 +230,9 @@ class OpenAPIAnalyzer:
         except (FileNotFoundError, ValueError) as e:
             logger.error(f"Failed to load spec: {e}")
             raise
+        
+        # Per-instance results of the internal passes, keyed by method name
+        self._cache: Dict[str, Any] = {}
     
     def get_basic_info(self) -> Dict[str, Any]:
         """
@@ -46,50 +252,86 @@ class OpenAPIAnalyzer:
             'file_path': str(self.spec_path)
         }
     
-    def analyze_paths(self) -> Dict[str, Any]:
+    @_memoized
+    def _collect_all(self) -> Dict[str, Any]:
         """
-        Analyze the paths and operations in the specification.
+        Gather the path, operation, tag, security and reference counters in one pass.
+        
+        The analyze_* methods all read from this shared result instead of each
+        re-iterating the paths and re-walking the spec.
         
         Returns:
-            Dictionary with path analysis results
+            Dictionary with the raw counters
         """
-        paths = self.spec.get('paths', {})
-        operation_counts = OperationCounter.count_operations(self.spec)
-        
-        # Analyze path patterns
-        path_patterns = defaultdict(int)
-        path_depths = []
-        parameterized_paths = 0
-        
-        for path in paths.keys():
-            # Count path parameters
-            if '{' in path:
-                parameterized_paths += 1
+        components = self.spec.get('components', {})
+        
+        # Every reference target the components section defines
+        component_refs = {
+            f"#/components/{comp_type}/{name}"
+            for comp_type in ComponentExtractor.COMPONENT_TYPES
+            for name in components.get(comp_type, {})
+        }
+        
+        # Reference usage only feeds the reusability score, so skip the tree
+        # walk entirely when there are no components to reference
+        collected = _scan_paths(
+            self.spec.get('paths', {}).items(),
+            component_refs or None,
+            bool(self.spec.get('security'))
+        )
+        
+        # References outside of paths (e.g. components referencing each other)
+        if component_refs:
+            for key, value in self.spec.items():
+                if key != 'paths':
+                    collected['total_refs'] += _count_refs(value, component_refs, collected['refs_used'])
+        
+        collected['component_refs'] = component_refs
+        return collected
+    
+    @classmethod
+    def stream_paths_analysis(cls, spec_path: str) -> Dict[str, Any]:
+        """
+        Analyze the paths of a JSON specification without loading the whole file.
+        
+        Path items are parsed one at a time with ijson, so peak memory is bounded
+        by the largest path item rather than the size of the spec.
+        
+        Args:
+            spec_path: Path to the OpenAPI specification file (JSON only)
             
-            # Analyze path depth
-            depth = len([p for p in path.split('/') if p])
-            path_depths.append(depth)
+        Returns:
+            Dictionary with path analysis results, as returned by analyze_paths
             
-            # Extract base pattern
-            base = path.split('/')[1] if len(path.split('/')) > 1 else 'root'
-            path_patterns[base] += 1
+        Raises:
+            ImportError: If ijson is not installed
+            ValueError: If the file is not valid JSON or its root is not an object
+        """
+        if ijson is None:
+            raise ImportError("ijson is required for streaming analysis")
+        
+        with open(spec_path, 'rb') as f:
+            try:
+                events = ijson.parse(f)
+                first = next(events, None)
+                if first is None or first[1] != 'start_map':
+                    raise ValueError("Invalid spec: root must be a dictionary")
+                
+                paths = ijson.kvitems(chain((first,), events), 'paths')
+                collected = _scan_paths(paths, None, False)
+            except ijson.JSONError as e:
+                raise ValueError(f"Failed to parse {spec_path}: {e}")
         
-        return {
-            'total_paths': len(paths),
-            'total_operations': operation_counts['total'],
-            'operations_by_method': {
-                method: count 
-                for method, count in operation_counts.items() 
-                if method != 'total' and count > 0
-            },
-            'parameterized_paths': parameterized_paths,
-            'average_path_depth': sum(path_depths) / len(path_depths) if path_depths else 0,
-            'max_path_depth': max(path_depths) if path_depths else 0,
-            'path_patterns': dict(path_patterns),
-            'paths_without_operations': len([p for p in paths.values() if not any(
-                m in p for m in OperationCounter.HTTP_METHODS
-            )])
-        }
+        return _summarize_paths(collected)
+    
+    def analyze_paths(self) -> Dict[str, Any]:
+        """
+        Analyze the paths and operations in the specification.
+        
+        Returns:
+            Dictionary with path analysis results
+        """
+        return _summarize_paths(self._collect_all())
     
     def analyze_components(self) -> Dict[str, Any]:
         """
@@ -99,48 +341,34 @@ class OpenAPIAnalyzer:
             Dictionary with component analysis results
         """
         components = self.spec.get('components', {})
+        if not components:
+            return {
+                'has_components': False,
+                'component_counts': {},
+                'reusability_score': 0,
+                'total_references': 0,
+                'unused_components': 0
+            }
         
         analysis = {
-            'has_components': bool(components),
+            'has_components': True,
             'component_counts': {},
             'reusability_score': 0
         }
         
-        total_refs = 0
-        unique_refs = set()
-        
         # Count each component type
         for comp_type in ComponentExtractor.COMPONENT_TYPES:
             if comp_type in components:
-                count = len(components[comp_type])
-                analysis['component_counts'][comp_type] = count
-                
-                # Track references for reusability analysis
-                for name in components[comp_type].keys():
-                    ref = f"#/components/{comp_type}/{name}"
-                    unique_refs.add(ref)
-        
-        # Analyze reference usage throughout the spec
-        def count_refs(obj, refs_found: Set[str]):
-            """Recursively count $ref usage."""
-            if isinstance(obj, dict):
-                if '$ref' in obj:
-                    refs_found.add(obj['$ref'])
-                    return 1
-                return sum(count_refs(v, refs_found) for v in obj.values())
-            elif isinstance(obj, list):
-                return sum(count_refs(item, refs_found) for item in obj)
-            return 0
-        
-        refs_used = set()
-        total_refs = count_refs(self.spec, refs_used)
-        
-        # Calculate reusability score
-        if unique_refs:
-            refs_actually_used = refs_used.intersection(unique_refs)
-            analysis['reusability_score'] = len(refs_actually_used) / len(unique_refs)
-            analysis['unused_components'] = len(unique_refs - refs_actually_used)
-            analysis['total_references'] = total_refs
+                analysis['component_counts'][comp_type] = len(components[comp_type])
+        
+        # Calculate reusability score from the component targets actually referenced
+        collected = self._collect_all()
+        component_refs = collected['component_refs']
+        if component_refs:
+            refs_used = len(collected['refs_used'])
+            analysis['reusability_score'] = refs_used / len(component_refs)
+            analysis['unused_components'] = len(component_refs) - refs_used
+            analysis['total_references'] = collected['total_refs']
         
         return analysis
     
@@ -152,24 +380,10 @@ class OpenAPIAnalyzer:
             Dictionary with tag analysis results
         """
         defined_tags = {tag['name']: tag for tag in self.spec.get('tags', [])}
-        used_tags = defaultdict(int)
-        untagged_operations = 0
-        
-        # Count tag usage in operations
-        for path, path_item in self.spec.get('paths', {}).items():
-            if not isinstance(path_item, dict):
-                continue
-            
-            for method in OperationCounter.HTTP_METHODS:
-                if method in path_item:
-                    operation = path_item[method]
-                    if isinstance(operation, dict):
-                        tags = operation.get('tags', [])
-                        if tags:
-                            for tag in tags:
-                                used_tags[tag] += 1
-                        else:
-                            untagged_operations += 1
+        collected = self._collect_all()
+        used_tags = collected['used_tags']
+        total_tag_uses = collected['total_tag_uses']
+        untagged_operations = collected['untagged_operations']
         
         # Find undefined tags (used but not defined)
         undefined_tags = set(used_tags.keys()) - set(defined_tags.keys())
@@ -185,7 +399,7 @@ class OpenAPIAnalyzer:
             'untagged_operations': untagged_operations,
             'tag_usage': dict(used_tags),
             'average_operations_per_tag': (
-                sum(used_tags.values()) / len(used_tags) if used_tags else 0
+                total_tag_uses / len(used_tags) if used_tags else 0
             )
         }
     
@@ -216,33 +430,29 @@ class OpenAPIAnalyzer:
             analysis['has_security'] = True
         
         # Count operations with/without security
-        for path, path_item in self.spec.get('paths', {}).items():
-            if not isinstance(path_item, dict):
-                continue
-            
-            for method in OperationCounter.HTTP_METHODS:
-                if method in path_item:
-                    operation = path_item[method]
-                    if isinstance(operation, dict):
-                        if 'security' in operation:
-                            analysis['operations_with_security'] += 1
-                        elif analysis['global_security']:
-                            analysis['operations_with_security'] += 1
-                        else:
-                            analysis['operations_without_security'] += 1
+        collected = self._collect_all()
+        analysis['operations_with_security'] = collected['operations_with_security']
+        analysis['operations_without_security'] = collected['operations_without_security']
         
         return analysis
     
-    def analyze_complexity(self) -> Dict[str, Any]:
+    def analyze_complexity(self, paths_analysis: Optional[Dict[str, Any]] = None,
+                           components_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Analyze the overall complexity of the specification.
         
+        Args:
+            paths_analysis: Precomputed analyze_paths() result (computed if not provided)
+            components_analysis: Precomputed analyze_components() result (computed if not provided)
+        
         Returns:
             Dictionary with complexity metrics
         """
         # Calculate various complexity metrics
-        paths_analysis = self.analyze_paths()
-        components_analysis = self.analyze_components()
+        if paths_analysis is None:
+            paths_analysis = self.analyze_paths()
+        if components_analysis is None:
+            components_analysis = self.analyze_components()
         
         # Estimate complexity score (0-100)
         complexity_score = 0
@@ -329,10 +539,10 @@ class OpenAPIAnalyzer:
             'paths': self.analyze_paths(),
             'components': self.analyze_components(),
             'tags': self.analyze_tags(),
-            'security': self.analyze_security(),
-            'complexity': self.analyze_complexity(),
-            'validation': self.validate()
+            'security': self.analyze_security()
         }
+        analysis['complexity'] = self.analyze_complexity(analysis['paths'], analysis['components'])
+        analysis['validation'] = self.validate()
         
         # Add recommendations based on analysis
         analysis['recommendations'] = self.generate_recommendations(analysis)
@@ -395,69 +605,74 @@ class OpenAPIAnalyzer:
         if analysis is None:
             analysis = self.generate_full_analysis()
         
-        print("\n" + "="*60)
-        print(f"OpenAPI Specification Analysis")
-        print("="*60)
+        # Build the whole report first and write it in one go
+        out: List[str] = []
+        
+        out.append("\n" + "="*60)
+        out.append(f"OpenAPI Specification Analysis")
+        out.append("="*60)
         
         # Basic info
         info = analysis['basic_info']
-        print(f"\nSpecification: {info['title']} v{info['version']}")
-        print(f"OpenAPI Version: {info['openapi_version']}")
-        print(f"File: {info['file_path']}")
-        print(f"Size: {info['file_size']:,} bytes")
+        out.append(f"\nSpecification: {info['title']} v{info['version']}")
+        out.append(f"OpenAPI Version: {info['openapi_version']}")
+        out.append(f"File: {info['file_path']}")
+        out.append(f"Size: {info['file_size']:,} bytes")
         
         # Paths
         paths = analysis['paths']
-        print(f"\nPaths & Operations:")
-        print(f"  Total Paths: {paths['total_paths']}")
-        print(f"  Total Operations: {paths['total_operations']}")
-        print(f"  Operations by Method:")
+        out.append(f"\nPaths & Operations:")
+        out.append(f"  Total Paths: {paths['total_paths']}")
+        out.append(f"  Total Operations: {paths['total_operations']}")
+        out.append(f"  Operations by Method:")
         for method, count in paths['operations_by_method'].items():
-            print(f"    {method.upper()}: {count}")
+            out.append(f"    {method.upper()}: {count}")
         
         # Components
         components = analysis['components']
         if components['component_counts']:
-            print(f"\nComponents:")
+            out.append(f"\nComponents:")
             for comp_type, count in components['component_counts'].items():
-                print(f"  {comp_type}: {count}")
-            print(f"  Reusability Score: {components['reusability_score']:.1%}")
+                out.append(f"  {comp_type}: {count}")
+            out.append(f"  Reusability Score: {components['reusability_score']:.1%}")
         
         # Tags
         tags = analysis['tags']
-        print(f"\nTags:")
-        print(f"  Defined: {tags['defined_tags']}")
-        print(f"  Used: {tags['used_tags']}")
+        out.append(f"\nTags:")
+        out.append(f"  Defined: {tags['defined_tags']}")
+        out.append(f"  Used: {tags['used_tags']}")
         if tags['undefined_tags']:
-            print(f"  Undefined: {', '.join(tags['undefined_tags'])}")
+            out.append(f"  Undefined: {', '.join(tags['undefined_tags'])}")
         
         # Security
         security = analysis['security']
-        print(f"\nSecurity:")
-        print(f"  Has Security: {'Yes' if security['has_security'] else 'No'}")
+        out.append(f"\nSecurity:")
+        out.append(f"  Has Security: {'Yes' if security['has_security'] else 'No'}")
         if security['security_schemes']:
-            print(f"  Schemes: {', '.join(security['security_schemes'])}")
-        print(f"  Protected Operations: {security['operations_with_security']}")
-        print(f"  Unprotected Operations: {security['operations_without_security']}")
+            out.append(f"  Schemes: {', '.join(security['security_schemes'])}")
+        out.append(f"  Protected Operations: {security['operations_with_security']}")
+        out.append(f"  Unprotected Operations: {security['operations_without_security']}")
         
         # Complexity
         complexity = analysis['complexity']
-        print(f"\nComplexity:")
-        print(f"  Score: {complexity['complexity_score']}/100 ({complexity['complexity_level']})")
+        out.append(f"\nComplexity:")
+        out.append(f"  Score: {complexity['complexity_score']}/100 ({complexity['complexity_level']})")
         
         # Validation
         validation = analysis['validation']
-        print(f"\nValidation:")
-        print(f"  Valid: {'Yes' if validation['is_valid'] else 'No'}")
+        out.append(f"\nValidation:")
+        out.append(f"  Valid: {'Yes' if validation['is_valid'] else 'No'}")
         if not validation['is_valid']:
-            print(f"  Issues: {validation['issue_count']}")
+            out.append(f"  Issues: {validation['issue_count']}")
             for issue in validation['issues'][:5]:  # Show first 5 issues
-                print(f"    - {issue}")
+                out.append(f"    - {issue}")
         
         # Recommendations
         if analysis['recommendations']:
-            print(f"\nRecommendations:")
+            out.append(f"\nRecommendations:")
             for i, rec in enumerate(analysis['recommendations'], 1):
-                print(f"  {i}. {rec}")
+                out.append(f"  {i}. {rec}")
+        
+        out.append("\n" + "="*60)
         
-        print("\n" + "="*60)
\ No newline at end of file
+        sys.stdout.write('\n'.join(out) + '\n')
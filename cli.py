@@ -3,14 +3,15 @@
 
 import sys
 import argparse
-import json
 from pathlib import Path
 import logging
 
-from splitter import OpenAPISplitter
-from merger import OpenAPIMerger
-from analyzer import OpenAPIAnalyzer
-from core import logger
+from core import logger, encode_json
+
+
+def _dumps(obj) -> str:
+    """Serialize an object to an indented JSON string."""
+    return encode_json(obj).decode('utf-8')
 
 
 def setup_logging(verbose: bool = False):
@@ -24,8 +25,12 @@ def setup_logging(verbose: bool = False):
 
 def cmd_split(args):
     """Handle the split command."""
+    # Imported lazily so other commands and --help don't pay for it
+    from splitter import OpenAPISplitter
+    
     try:
-        splitter = OpenAPISplitter(args.spec_file, args.output_dir)
+        splitter = OpenAPISplitter(args.spec_file, args.output_dir,
+                                   prune_components=args.prune_components)
         
         # Show analysis first
         if not args.quiet:
@@ -45,7 +50,7 @@ def cmd_split(args):
             result = splitter.split_by_size(args.max_operations)
         
         if args.json_output:
-            print(json.dumps(result, indent=2))
+            print(_dumps(result))
         
         return 0
         
@@ -56,6 +61,8 @@ def cmd_split(args):
 
 def cmd_merge(args):
     """Handle the merge command."""
+    from merger import OpenAPIMerger
+    
     try:
         merger = OpenAPIMerger(args.input_dir, args.output)
         
@@ -65,7 +72,8 @@ def cmd_merge(args):
         # Perform merge
         stats = merger.merge_all(
             conflict_strategy=args.conflict_strategy,
-            output_format=output_format
+            output_format=output_format,
+            fast_yaml=args.fast_yaml
         )
         
         # Validate if requested
@@ -79,7 +87,7 @@ def cmd_merge(args):
                 print("\nMerged spec is valid!")
         
         if args.json_output:
-            print(json.dumps(stats, indent=2))
+            print(_dumps(stats))
         
         return 0
         
@@ -88,9 +96,36 @@ def cmd_merge(args):
         return 1
 
 
+def _print_section(name: str, section, json_output: bool) -> None:
+    """Print a single analysis section as JSON or key/value lines."""
+    if json_output:
+        print(_dumps(section))
+    elif isinstance(section, list):
+        print(f"\n{name.title()}:")
+        for i, item in enumerate(section, 1):
+            print(f"  {i}. {item}")
+    else:
+        print(f"\n{name.title()} Analysis:")
+        for key, value in section.items():
+            print(f"  {key}: {value}")
+
+
 def cmd_analyze(args):
     """Handle the analyze command."""
+    from analyzer import OpenAPIAnalyzer
+    
     try:
+        # Path statistics for JSON specs can be streamed without loading the whole file
+        if args.section == 'paths' and not args.full and args.spec_file.endswith('.json'):
+            try:
+                paths_analysis = OpenAPIAnalyzer.stream_paths_analysis(args.spec_file)
+            except ImportError:
+                paths_analysis = None  # ijson not installed, use the regular loader
+            
+            if paths_analysis is not None:
+                _print_section(args.section, paths_analysis, args.json_output)
+                return 0
+        
         analyzer = OpenAPIAnalyzer(args.spec_file)
         
         if args.full:
@@ -98,37 +133,40 @@ def cmd_analyze(args):
             analysis = analyzer.generate_full_analysis()
             
             if args.json_output:
-                print(json.dumps(analysis, indent=2))
+                print(_dumps(analysis))
             else:
                 analyzer.print_summary(analysis)
             
             # Save to file if requested
             if args.output:
                 output_path = Path(args.output)
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(analysis, f, indent=2)
+                with open(output_path, 'wb') as f:
+                    f.write(encode_json(analysis))
                 print(f"\nAnalysis saved to {output_path}")
         
-        else:
-            # Basic analysis only
-            analysis = analyzer.generate_full_analysis()
+        elif args.section:
+            # Only run the analyzer behind the requested section
+            section_fns = {
+                'basic_info': analyzer.get_basic_info,
+                'paths': analyzer.analyze_paths,
+                'components': analyzer.analyze_components,
+                'tags': analyzer.analyze_tags,
+                'security': analyzer.analyze_security,
+                'complexity': analyzer.analyze_complexity,
+                'validation': analyzer.validate,
+                'recommendations': lambda: analyzer.generate_full_analysis()['recommendations']
+            }
             
-            # Show specific section if requested
-            if args.section:
-                if args.section in analysis:
-                    if args.json_output:
-                        print(json.dumps(analysis[args.section], indent=2))
-                    else:
-                        print(f"\n{args.section.title()} Analysis:")
-                        for key, value in analysis[args.section].items():
-                            print(f"  {key}: {value}")
-                else:
-                    logger.error(f"Unknown section: {args.section}")
-                    print(f"Available sections: {', '.join(analysis.keys())}")
-                    return 1
-            else:
-                # Default summary
-                analyzer.print_summary(analysis)
+            if args.section not in section_fns:
+                logger.error(f"Unknown section: {args.section}")
+                print(f"Available sections: {', '.join(section_fns)}")
+                return 1
+            
+            _print_section(args.section, section_fns[args.section](), args.json_output)
+        
+        else:
+            # Default summary
+            analyzer.print_summary()
         
         return 0
         
@@ -139,12 +177,14 @@ def cmd_analyze(args):
 
 def cmd_validate(args):
     """Handle the validate command."""
+    from analyzer import OpenAPIAnalyzer
+    
     try:
         analyzer = OpenAPIAnalyzer(args.spec_file)
         validation = analyzer.validate()
         
         if args.json_output:
-            print(json.dumps(validation, indent=2))
+            print(_dumps(validation))
         else:
             if validation['is_valid']:
                 print(f"✓ Specification is valid")
@@ -204,6 +244,8 @@ Examples:
                             help='Split method: by tags, by path prefix, or by size (default: path)')
     split_parser.add_argument('--max-operations', type=int, default=30,
                             help='Maximum operations per file for path/size methods (default: 30)')
+    split_parser.add_argument('--prune-components', action='store_true',
+                            help='Only include the components each file references')
     
     # Merge command
     merge_parser = subparsers.add_parser('merge', 
@@ -218,6 +260,8 @@ Examples:
                             help='How to handle component conflicts (default: keep_first)')
     merge_parser.add_argument('--validate', action='store_true',
                             help='Validate the merged specification')
+    merge_parser.add_argument('--fast-yaml', action='store_true',
+                            help='Write YAML output in JSON syntax (valid YAML, much faster to write)')
     
     # Analyze command
     analyze_parser = subparsers.add_parser('analyze', 
@@ -228,7 +272,8 @@ Examples:
                               help='Show full detailed analysis')
     analyze_parser.add_argument('--section', 
                               choices=['basic_info', 'paths', 'components', 'tags', 
-                                     'security', 'complexity', 'validation'],
+                                     'security', 'complexity', 'validation',
+                                     'recommendations'],
                               help='Show specific analysis section')
     analyze_parser.add_argument('--output', 
                               help='Save analysis to JSON file')
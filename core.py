@@ -1,15 +1,243 @@
 """Core utilities and base classes for OpenAPI specification handling."""
 
 import json
+import math
+import mmap
+import os
+import pickle
+import re
+import threading
 import yaml
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, BinaryIO, Iterator, Optional, Tuple, Union
 import logging
 
+try:
+    import orjson
+except ImportError:  # optional C-accelerated JSON codec, fall back to stdlib json
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Use libyaml's C loader/dumper when PyYAML was built with it
+_YamlSafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YamlSafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# JSON files at least this large are parsed straight from a memory map
+_MMAP_THRESHOLD = 100 * 1024 * 1024
+
+# orjson reads integers outside the 64-bit range as floats; any run of 19+
+# digits (possibly such an integer, e.g. below -2**63) sends the document to json instead
+_WIDE_DIGITS = re.compile(rb'\d{19}')
+
+# Pickled parsed specs keyed by (absolute path, mtime_ns, size), least recently
+# used first. Only slow parses (YAML, or JSON without orjson) are cached, and
+# the pickles are bounded by their total size.
+_SPEC_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_spec_cache: 'OrderedDict[Tuple[str, int, int], bytes]' = OrderedDict()
+_spec_cache_bytes = 0
+_spec_cache_lock = threading.Lock()
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Whether a JSON-like object contains a NaN or infinite float anywhere."""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, float) and not math.isfinite(value):
+            return True
+    return False
+
+
+def encode_json(obj: Any, indent: Optional[int] = 2) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON, using orjson when available.
+    
+    Args:
+        obj: Object to serialize
+        indent: Indentation level (orjson is used for 2 or None)
+        
+    Returns:
+        The encoded JSON document
+    """
+    if orjson is not None and indent in (2, None):
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            data = orjson.dumps(obj, option=option)
+        except (TypeError, orjson.JSONEncodeError):
+            pass  # e.g. integers wider than 64 bits, which json handles
+        else:
+            # orjson writes NaN and Infinity as null, where json keeps them
+            if b'null' not in data or not _has_non_finite(obj):
+                return data
+    return json.dumps(obj, indent=indent, ensure_ascii=False).encode('utf-8')
+
+
+# Characters a YAML reader rejects but JSON encoders write unescaped
+_YAML_UNSAFE_CHARS = re.compile('[\x7f-\x9f\u2028\u2029\ufffe\uffff\ud800-\udfff]')
+
+# YAML readers reject implicit keys longer than this, counting quotes and escapes
+_YAML_MAX_KEY_LENGTH = 1024
+
+# Range of integers orjson can encode
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 64) - 1
+
+
+def _is_json_safe(obj: Any) -> bool:
+    """
+    Check whether an object's JSON encoding reads back identically as YAML.
+    
+    Only plain dicts with string keys of limited length, lists, strings,
+    booleans, None, 64-bit integers and finite floats written without an
+    exponent qualify.
+    
+    Args:
+        obj: Object to check
+        
+    Returns:
+        True if the object can be written as JSON to a YAML file
+    """
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        
+        if value_type is dict:
+            for key in value:
+                if type(key) is not str or _YAML_UNSAFE_CHARS.search(key):
+                    return False
+                # An escape takes at most 6 characters, so short keys always fit
+                if (len(key) * 6 + 2 > _YAML_MAX_KEY_LENGTH
+                        and len(json.dumps(key, ensure_ascii=False)) > _YAML_MAX_KEY_LENGTH):
+                    return False
+            stack.extend(value.values())
+        elif value_type is list:
+            stack.extend(value)
+        elif value_type is str:
+            if _YAML_UNSAFE_CHARS.search(value):
+                return False
+        elif value_type is int:
+            if not _INT_MIN <= value <= _INT_MAX:
+                return False
+        elif value_type is float:
+            # YAML 1.1 reads exponents without a dot (1e16) as strings
+            text = repr(value)
+            if 'e' in text or 'n' in text:  # also nan and inf
+                return False
+        elif value is not None and value_type is not bool:
+            return False
+    
+    return True
+
+
+def _json_key(key: Any) -> Any:
+    """Convert a non-string dictionary key to the string JSON would write for it."""
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, (int, float)):
+        return json.dumps(key)
+    return key
+
+
+def _freeze(obj: Any) -> Any:
+    """
+    Convert a JSON-like object into an equivalent hashable, order-independent form.
+    
+    Dictionaries become frozensets of their items and lists become tuples, so
+    key order doesn't affect comparisons while list order still does. Number
+    and boolean values are paired with their type, so True, 1 and 1.0 stay
+    distinct as they are in JSON; keys are compared as JSON writes them, so
+    YAML's 200 matches JSON's "200".
+    
+    Args:
+        obj: JSON-compatible object
+        
+    Returns:
+        Frozen form of the object, comparable with ==
+    """
+    if isinstance(obj, dict):
+        return frozenset(
+            (key if type(key) is str else _json_key(key), _freeze(value))
+            for key, value in obj.items()
+        )
+    if isinstance(obj, list):
+        return tuple(_freeze(item) for item in obj)
+    if isinstance(obj, (bool, int, float)):
+        return (type(obj), obj)
+    return obj
+
+
+def _load_json(f: BinaryIO, size: int) -> Any:
+    """
+    Parse JSON from an open binary file, using orjson on the raw bytes when it is available.
+    
+    Args:
+        f: Binary file object positioned at the start of the document
+        size: Size of the file in bytes
+        
+    Returns:
+        The parsed JSON document
+    """
+    if orjson is None:
+        return json.loads(f.read())
+    
+    if size >= _MMAP_THRESHOLD:
+        # Skip the intermediate bytes copy for very large specs
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _WIDE_DIGITS.search(mm) is not None:
+                return json.loads(mm[:])
+            try:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+            except orjson.JSONDecodeError:
+                # e.g. NaN or Infinity, which json accepts (and writes by default)
+                return json.loads(mm[:])
+    
+    data = f.read()
+    if _WIDE_DIGITS.search(data) is not None:
+        return json.loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # e.g. NaN or Infinity, which json accepts (and writes by default)
+        return json.loads(data)
+
+
+def _cache_spec(key: Tuple[str, int, int], blob: bytes) -> None:
+    """
+    Store a pickled spec, evicting least recently used entries to stay within budget.
+    
+    Args:
+        key: (absolute path, mtime_ns, size) of the parsed file
+        blob: Pickled spec
+    """
+    global _spec_cache_bytes
+    
+    with _spec_cache_lock:
+        previous = _spec_cache.pop(key, None)
+        if previous is not None:
+            _spec_cache_bytes -= len(previous)
+        
+        _spec_cache[key] = blob
+        _spec_cache_bytes += len(blob)
+        
+        while _spec_cache_bytes > _SPEC_CACHE_MAX_BYTES:
+            _, evicted = _spec_cache.popitem(last=False)
+            _spec_cache_bytes -= len(evicted)
+
 
 class SpecLoader:
     """Utility class for loading OpenAPI specifications."""
@@ -19,6 +247,11 @@ class SpecLoader:
         """
         Load an OpenAPI specification from a file.
         
+        YAML specs (and JSON specs when orjson is unavailable) are cached by
+        (path, mtime, size), so loading an unchanged file again skips the slow
+        parse. Every call returns an independent copy that the caller is free
+        to modify.
+        
         Args:
             file_path: Path to the OpenAPI spec file (JSON or YAML)
             
@@ -31,33 +264,80 @@ class SpecLoader:
         """
         file_path = Path(file_path)
         
-        if not file_path.exists():
-            raise FileNotFoundError(f"Specification file not found: {file_path}")
+        # Open once and stat the descriptor, so the cache key describes exactly
+        # the contents being parsed
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Specification file not found: {file_path}") from None
         
+        with os.fdopen(fd, 'rb', buffering=0) as f:
+            stat = os.fstat(fd)
+            
+            # orjson parses faster than a pickle round trip, so only cache slow parses
+            if file_path.suffix == '.json' and orjson is not None:
+                return SpecLoader._parse_spec(file_path, f, stat.st_size)
+            
+            key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+            
+            with _spec_cache_lock:
+                blob = _spec_cache.get(key)
+                if blob is not None:
+                    _spec_cache.move_to_end(key)
+            
+            if blob is not None:
+                return pickle.loads(blob)
+            
+            spec = SpecLoader._parse_spec(file_path, f, stat.st_size)
+        
+        # Cache a pickled snapshot rather than the dict itself so callers never
+        # share mutable state; unpickling is much cheaper than re-parsing
+        blob = pickle.dumps(spec, pickle.HIGHEST_PROTOCOL)
+        if len(blob) <= _SPEC_CACHE_MAX_BYTES:
+            _cache_spec(key, blob)
+        
+        return spec
+    
+    @staticmethod
+    def _parse_spec(file_path: Path, f: BinaryIO, size: int) -> Dict[str, Any]:
+        """
+        Parse an OpenAPI specification file.
+        
+        Args:
+            file_path: Path to the OpenAPI spec file (JSON or YAML)
+            f: The file opened in binary mode
+            size: Size of the file in bytes
+            
+        Returns:
+            Dictionary containing the OpenAPI specification
+            
+        Raises:
+            ValueError: If the file format is not supported or invalid
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                if file_path.suffix in ['.yaml', '.yml']:
-                    spec = yaml.safe_load(f)
-                elif file_path.suffix == '.json':
-                    spec = json.load(f)
-                else:
-                    raise ValueError(f"Unsupported file format: {file_path.suffix}")
-                
-                # Validate basic structure
-                if not isinstance(spec, dict):
-                    raise ValueError("Invalid spec: root must be a dictionary")
-                
-                if 'openapi' not in spec and 'swagger' not in spec:
-                    logger.warning("No OpenAPI/Swagger version found in spec")
-                
-                return spec
-                
+            suffix = file_path.suffix
+            if suffix in ['.yaml', '.yml']:
+                spec = yaml.load(f.read(), Loader=_YamlSafeLoader)
+            elif suffix == '.json':
+                spec = _load_json(f, size)
+            else:
+                raise ValueError(f"Unsupported file format: {suffix}")
+            
+            # Validate basic structure
+            if not isinstance(spec, dict):
+                raise ValueError("Invalid spec: root must be a dictionary")
+            
+            if 'openapi' not in spec and 'swagger' not in spec:
+                logger.warning("No OpenAPI/Swagger version found in spec")
+            
+            return spec
+            
         except (json.JSONDecodeError, yaml.YAMLError) as e:
             raise ValueError(f"Failed to parse {file_path}: {e}")
     
     @staticmethod
     def save_spec(spec: Dict[str, Any], file_path: Union[str, Path], 
-                  format: str = 'json', indent: int = 2) -> None:
+                  format: str = 'json', indent: int = 2, fast_yaml: bool = False) -> None:
         """
         Save an OpenAPI specification to a file.
         
@@ -66,19 +346,26 @@ class SpecLoader:
             file_path: Path where to save the spec
             format: Output format ('json' or 'yaml')
             indent: Indentation level for JSON output
+            fast_yaml: Write YAML output in JSON syntax (itself valid YAML) when
+                the spec reads back unchanged, instead of using the slower block style
         """
         file_path = Path(file_path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                if format == 'json':
-                    json.dump(spec, f, indent=indent, ensure_ascii=False)
-                elif format in ['yaml', 'yml']:
-                    yaml.dump(spec, f, default_flow_style=False, 
-                             allow_unicode=True, sort_keys=False)
-                else:
-                    raise ValueError(f"Unsupported format: {format}")
+            # Serialize in memory so the file is written with a single call
+            if format == 'json':
+                data = encode_json(spec, indent)
+            elif format in ['yaml', 'yml'] and fast_yaml and _is_json_safe(spec):
+                data = encode_json(spec, 2)
+            elif format in ['yaml', 'yml']:
+                data = yaml.dump(spec, Dumper=_YamlSafeDumper, default_flow_style=False, 
+                                 allow_unicode=True, sort_keys=False, encoding='utf-8')
+            else:
+                raise ValueError(f"Unsupported format: {format}")
+            
+            with open(file_path, 'wb') as f:
+                f.write(data)
             
             logger.info(f"Saved spec to {file_path}")
             
@@ -97,28 +384,34 @@ class ComponentExtractor:
     ]
     
     @classmethod
-    def extract_components(cls, spec: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    def extract_components(cls, spec: Dict[str, Any], copy: bool = False) -> Dict[str, Dict[str, Any]]:
         """
         Extract all components from an OpenAPI specification.
         
         Args:
             spec: OpenAPI specification dictionary
+            copy: Return shallow copies of each component type instead of the
+                spec's own dictionaries (needed only if the caller mutates them)
             
         Returns:
             Dictionary of component types and their definitions
         """
-        components = {comp_type: {} for comp_type in cls.COMPONENT_TYPES}
+        source = spec.get('components') or {}
+        components = {}
         
-        if 'components' in spec:
-            for comp_type in cls.COMPONENT_TYPES:
-                if comp_type in spec['components']:
-                    components[comp_type] = spec['components'][comp_type].copy()
+        for comp_type in cls.COMPONENT_TYPES:
+            items = source.get(comp_type)
+            if items is None:
+                components[comp_type] = {}
+            else:
+                components[comp_type] = items.copy() if copy else items
         
         return components
     
     @classmethod
     def merge_components(cls, target: Dict[str, Any], source: Dict[str, Any],
-                        conflict_strategy: str = 'keep_first') -> Dict[str, int]:
+                        conflict_strategy: str = 'keep_first',
+                        fingerprint_cache: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
         """
         Merge components from source into target.
         
@@ -126,11 +419,15 @@ class ComponentExtractor:
             target: Target component dictionary to merge into
             source: Source component dictionary to merge from
             conflict_strategy: How to handle conflicts ('keep_first', 'keep_last', 'error')
+            fingerprint_cache: Frozen forms of the target's definitions by component
+                type and name, reused across calls that merge into the same target
             
         Returns:
             Dictionary with conflict counts per component type
         """
         conflicts = {comp_type: 0 for comp_type in cls.COMPONENT_TYPES}
+        if fingerprint_cache is None:
+            fingerprint_cache = {}
         
         for comp_type in cls.COMPONENT_TYPES:
             if comp_type not in source:
@@ -139,11 +436,30 @@ class ComponentExtractor:
             if comp_type not in target:
                 target[comp_type] = {}
             
-            for name, definition in source[comp_type].items():
-                if name in target[comp_type]:
-                    # Check if definitions are different
-                    existing = json.dumps(target[comp_type][name], sort_keys=True)
-                    new = json.dumps(definition, sort_keys=True)
+            target_items = target[comp_type]
+            source_items = source[comp_type]
+            
+            # Nothing can conflict when no names are shared, so skip the per-name loop
+            if target_items.keys().isdisjoint(source_items):
+                target_items.update(source_items)
+                continue
+            
+            known = fingerprint_cache.setdefault(comp_type, {})
+            
+            for name, definition in source_items.items():
+                if name in target_items:
+                    # The same definition object needs no freezing; plain ==
+                    # would treat True, 1 and 1.0 as equal
+                    current = target_items[name]
+                    if current is definition:
+                        continue
+                    
+                    # Check if definitions are different, freezing each existing
+                    # definition at most once per target
+                    existing = known.get(name)
+                    if existing is None:
+                        existing = known[name] = _freeze(current)
+                    new = _freeze(definition)
                     
                     if existing != new:
                         conflicts[comp_type] += 1
@@ -151,12 +467,13 @@ class ComponentExtractor:
                         if conflict_strategy == 'error':
                             raise ValueError(f"Conflicting {comp_type} '{name}'")
                         elif conflict_strategy == 'keep_last':
-                            target[comp_type][name] = definition
-                            logger.warning(f"Overwriting {comp_type} '{name}'")
+                            target_items[name] = definition
+                            known[name] = new
+                            logger.warning("Overwriting %s '%s'", comp_type, name)
                         else:  # keep_first
-                            logger.debug(f"Keeping existing {comp_type} '{name}'")
+                            logger.debug("Keeping existing %s '%s'", comp_type, name)
                 else:
-                    target[comp_type][name] = definition
+                    target_items[name] = definition
         
         return conflicts
 
@@ -165,6 +482,7 @@ class OperationCounter:
     """Count operations in OpenAPI specifications."""
     
     HTTP_METHODS = ['get', 'post', 'put', 'delete', 'patch', 'options', 'head', 'trace']
+    HTTP_METHODS_SET = frozenset(HTTP_METHODS)
     
     @classmethod
     def count_operations(cls, spec: Dict[str, Any]) -> Dict[str, int]:
@@ -179,42 +497,59 @@ class OperationCounter:
         """
         counts = {method: 0 for method in cls.HTTP_METHODS}
         counts['total'] = 0
+        methods = cls.HTTP_METHODS_SET
         
-        paths = spec.get('paths', {})
+        paths = spec.get('paths') or {}
         for path, path_item in paths.items():
             if not isinstance(path_item, dict):
                 continue
                 
-            for method in cls.HTTP_METHODS:
-                if method in path_item:
+            for method in path_item:
+                if method in methods:
                     counts[method] += 1
                     counts['total'] += 1
         
         return counts
     
     @classmethod
-    def get_operations(cls, spec: Dict[str, Any]) -> list:
+    def iter_operations(cls, spec: Dict[str, Any]) -> Iterator[Tuple[str, str, Any]]:
         """
-        Get all operations from an OpenAPI specification.
+        Iterate over all operations in an OpenAPI specification.
         
         Args:
             spec: OpenAPI specification dictionary
             
-        Returns:
-            List of tuples (path, method, operation)
+        Yields:
+            Tuples (path, method, operation), in spec order
         """
-        operations = []
-        paths = spec.get('paths', {})
+        methods = cls.HTTP_METHODS_SET
+        paths = spec.get('paths') or {}
         
         for path, path_item in paths.items():
             if not isinstance(path_item, dict):
                 continue
                 
-            for method in cls.HTTP_METHODS:
-                if method in path_item:
-                    operations.append((path, method, path_item[method]))
+            for method, operation in path_item.items():
+                if method in methods:
+                    yield path, method, operation
+    
+    @classmethod
+    def get_operations(cls, spec: Dict[str, Any]) -> list:
+        """
+        Get all operations from an OpenAPI specification.
         
-        return operations
+        Args:
+            spec: OpenAPI specification dictionary
+            
+        Returns:
+            List of tuples (path, method, operation), in spec order
+        """
+        return list(cls.iter_operations(spec))
+
+
+# Keys checked by validate_spec_structure
+_VERSION_KEYS = ('openapi', 'swagger')
+_REQUIRED_INFO = ('title', 'version')
 
 
 def validate_spec_structure(spec: Dict[str, Any]) -> list:
@@ -230,31 +565,33 @@ def validate_spec_structure(spec: Dict[str, Any]) -> list:
     issues = []
     
     # Check for OpenAPI version
-    if 'openapi' not in spec and 'swagger' not in spec:
+    if not any(key in spec for key in _VERSION_KEYS):
         issues.append("Missing OpenAPI/Swagger version field")
     
     # Check for info object
     if 'info' not in spec:
         issues.append("Missing 'info' object")
-    elif not isinstance(spec['info'], dict):
-        issues.append("'info' must be an object")
     else:
-        if 'title' not in spec['info']:
-            issues.append("Missing 'info.title'")
-        if 'version' not in spec['info']:
-            issues.append("Missing 'info.version'")
+        info = spec['info']
+        if not isinstance(info, dict):
+            issues.append("'info' must be an object")
+        else:
+            for key in _REQUIRED_INFO:
+                if key not in info:
+                    issues.append(f"Missing 'info.{key}'")
     
     # Check paths
     if 'paths' not in spec:
         issues.append("Missing 'paths' object")
-    elif not isinstance(spec['paths'], dict):
-        issues.append("'paths' must be an object")
-    elif not spec['paths']:
-        issues.append("'paths' is empty")
+    else:
+        paths = spec['paths']
+        if not isinstance(paths, dict):
+            issues.append("'paths' must be an object")
+        elif not paths:
+            issues.append("'paths' is empty")
     
     # Check components structure if present
-    if 'components' in spec:
-        if not isinstance(spec['components'], dict):
-            issues.append("'components' must be an object")
+    if 'components' in spec and not isinstance(spec['components'], dict):
+        issues.append("'components' must be an object")
     
     return issues
\ No newline at end of file
@@ -1,11 +1,249 @@
 """OpenAPI specification merger module."""
 
 import json
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, BinaryIO, Iterator, List, Optional, Set, Tuple
 import logging
 
-from core import SpecLoader, ComponentExtractor, logger
+from core import SpecLoader, ComponentExtractor, OperationCounter, validate_spec_structure, logger
+
+try:
+    import ijson
+except ImportError:  # optional streaming parser, large files are loaded whole without it
+    ijson = None
+
+# HTTP methods that make a path item key an operation
+_HTTP_METHODS = OperationCounter.HTTP_METHODS_SET
+
+# Info fields added by the splitter, dropped when merging
+_SPLIT_KEYS = frozenset(('x-split-part', 'x-split-timestamp'))
+
+# Extensions of spec files picked up when there is no split mapping
+_SPEC_SUFFIXES = ('.json', '.yaml', '.yml')
+
+# JSON files at least this large are streamed with ijson (when installed)
+_STREAM_THRESHOLD = 256 * 1024
+
+# Spec files are parsed in worker processes only when they add up to at least
+# this many bytes; below it, starting the pool costs more than it saves
+_PARALLEL_THRESHOLD = 8 * 1024 * 1024
+
+
+def _build_value(events: Iterator[Tuple[str, str, Any]], event: str, value: Any) -> Any:
+    """
+    Materialize the JSON value that starts with the given ijson event.
+    
+    Non-integral numbers, which ijson reads as Decimal, become floats as they
+    would with json.load; integers keep their full width.
+    
+    Args:
+        events: The ijson event stream, positioned just after the first event
+        event: The value's first event
+        value: The value's first event payload
+        
+    Returns:
+        The parsed value
+    """
+    if event not in ('start_map', 'start_array'):
+        return float(value) if type(value) is Decimal else value
+    
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1
+    for _, event, value in events:
+        if type(value) is Decimal:
+            value = float(value)
+        builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+            if depth == 0:
+                break
+    return builder.value
+
+
+def _iter_streamed_spec(f: BinaryIO) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Parse a JSON spec incrementally, yielding paths and components one at a time.
+    
+    Yields ('paths', path, path_item) for each path, ('components', comp_type,
+    {name: definition}) for each component, and ('root', key, value) for every
+    other top-level property.
+    
+    Args:
+        f: Binary file object positioned at the start of the spec
+        
+    Raises:
+        ValueError: If the root of the document is not an object
+    """
+    # use_float makes the C backend reject integers wider than 64 bits, so
+    # numbers are converted in _build_value instead; _check_streamed_spec
+    # parses with the same (default) settings
+    events = ijson.parse(f)
+    
+    for prefix, event, value in events:
+        if prefix == '' and event == 'start_map':
+            break
+        raise ValueError("Invalid spec: root must be a dictionary")
+    
+    for _, event, key in events:
+        if event != 'map_key':
+            break  # end of the root object
+        
+        _, event, value = next(events)
+        
+        if key == 'paths' and event == 'start_map':
+            for _, event, path in events:
+                if event != 'map_key':
+                    break
+                _, event, value = next(events)
+                yield 'paths', path, _build_value(events, event, value)
+        
+        elif key == 'components' and event == 'start_map':
+            for _, event, comp_type in events:
+                if event != 'map_key':
+                    break
+                _, event, value = next(events)
+                if event != 'start_map':
+                    yield 'components', comp_type, _build_value(events, event, value)
+                    continue
+                for _, event, name in events:
+                    if event != 'map_key':
+                        break
+                    _, event, value = next(events)
+                    yield 'components', comp_type, {name: _build_value(events, event, value)}
+        
+        else:
+            yield 'root', key, _build_value(events, event, value)
+
+
+def _check_streamed_spec(f: BinaryIO) -> None:
+    """
+    Check a JSON spec's syntax without building it, in constant memory.
+    
+    Args:
+        f: Binary file object positioned at the start of the spec
+        
+    Raises:
+        ijson.JSONError: If the file is not valid JSON
+        ValueError: If the root of the document is not an object
+    """
+    # Same parse settings as _iter_streamed_spec, so a file that passes here
+    # parses there too
+    events = ijson.basic_parse(f)
+    if next(events, (None, None))[0] != 'start_map':
+        raise ValueError("Invalid spec: root must be a dictionary")
+    for _ in events:
+        pass
+
+
+def _load_spec_file(file_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Load a spec file, reporting failure instead of raising.
+    
+    Args:
+        file_path: Path to the spec file
+        
+    Returns:
+        (spec, None) on success, (None, error message) on failure
+    """
+    try:
+        return SpecLoader.load_spec(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _parse_spec_file(file_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Parse a spec file in a worker, bypassing the spec cache.
+    
+    Each worker parses a file once, so pickling it into the cache would be wasted work.
+    
+    Args:
+        file_path: Path to the spec file
+        
+    Returns:
+        (spec, None) on success, (None, error message) on failure
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            return SpecLoader._parse_spec(file_path, f, os.fstat(f.fileno()).st_size), None
+    except FileNotFoundError:
+        return None, f"Specification file not found: {file_path}"
+    except Exception as e:
+        return None, str(e)
+
+
+def _parse_bounded(ex: Executor, file_paths: List[Path],
+                   window: int) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Parse spec files on an executor, yielding results in order.
+    
+    At most `window` files are in flight or waiting to be consumed, so parsed
+    specs don't pile up ahead of the merge.
+    
+    Args:
+        ex: Executor to parse on
+        file_paths: Paths to the spec files
+        window: Maximum number of outstanding files
+        
+    Yields:
+        One (spec, error) pair per file, see _parse_spec_file
+    """
+    pending = deque()
+    for file_path in file_paths:
+        pending.append(ex.submit(_parse_spec_file, file_path))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    
+    while pending:
+        yield pending.popleft().result()
+
+
+def _iter_spec_files(file_paths: List[Path]) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Parse spec files concurrently, yielding results in order as they become available.
+    
+    Parsing is CPU-bound, so a process pool is tried first; where worker
+    processes can't be started, the remaining files are parsed with threads.
+    
+    Args:
+        file_paths: Paths to the spec files
+        
+    Yields:
+        One (spec, error) pair per file, see _parse_spec_file
+    """
+    workers = min(len(file_paths), os.cpu_count() or 1)
+    window = 2 * workers
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for result in _parse_bounded(ex, file_paths, window):
+                yield result
+                done += 1
+        return
+    except (OSError, NotImplementedError, BrokenProcessPool) as e:
+        logger.debug(f"Process pool unavailable ({e}), loading with threads")
+    
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        yield from _parse_bounded(ex, file_paths[done:], window)
+
+
+def _total_size(file_paths: List[Path]) -> int:
+    """Combined size of the given files in bytes, counting missing files as empty."""
+    total = 0
+    for file_path in file_paths:
+        try:
+            total += file_path.stat().st_size
+        except OSError:
+            pass
+    return total
 
 
 class OpenAPIMerger:
@@ -36,6 +274,17 @@ class OpenAPIMerger:
             'components': {}
         }
         
+        # Split mapping, read at most once per merger
+        self._mapping: Optional[Dict[str, Any]] = None
+        self._mapping_loaded = False
+        
+        # Frozen forms of merged component definitions, shared across files
+        self._fingerprints: Dict[str, Dict[str, Any]] = {}
+        
+        # Dedup indexes for merged servers and tags, built on first use
+        self._server_keys: Optional[Set[str]] = None
+        self._tags_by_name: Optional[Dict[str, Dict[str, Any]]] = None
+        
         # Track merge statistics
         self.stats = {
             'files_processed': 0,
@@ -52,14 +301,19 @@ class OpenAPIMerger:
         Returns:
             Mapping dictionary or None if not found
         """
+        if self._mapping_loaded:
+            return self._mapping
+        
         mapping_path = self.input_dir / 'split_mapping.json'
         if mapping_path.exists():
             try:
                 with open(mapping_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    self._mapping = json.load(f)
             except (json.JSONDecodeError, IOError) as e:
                 logger.warning(f"Failed to load mapping file: {e}")
-        return None
+        
+        self._mapping_loaded = True
+        return self._mapping
     
     def get_spec_files(self) -> List[Path]:
         """
@@ -70,22 +324,26 @@ class OpenAPIMerger:
         """
         mapping = self.load_mapping()
         
+        # List the directory once; both branches only need the regular file names
+        with os.scandir(self.input_dir) as entries:
+            names = {entry.name for entry in entries if entry.is_file()}
+        
         if mapping and 'files' in mapping:
             # Use files from mapping
             files = []
             for file_info in mapping['files']:
                 file_path = self.input_dir / file_info['name']
-                if file_path.exists():
+                if file_info['name'] in names or file_path.exists():
                     files.append(file_path)
                 else:
                     logger.warning(f"File from mapping not found: {file_path}")
             return files
         else:
             # Find all spec files in directory
-            files = list(self.input_dir.glob("spec_*.json"))
-            files.extend(self.input_dir.glob("spec_*.yaml"))
-            files.extend(self.input_dir.glob("spec_*.yml"))
-            return sorted(files)
+            return [
+                self.input_dir / name for name in sorted(names)
+                if name.startswith('spec_') and name.endswith(_SPEC_SUFFIXES)
+            ]
     
     def merge_info(self, spec: Dict[str, Any]) -> None:
         """
@@ -101,12 +359,10 @@ class OpenAPIMerger:
         
         # On first spec, copy most of the info
         if self.stats['files_processed'] == 0:
-            self.merged_spec['info'] = source_info.copy()
-            
-            # Remove split indicators
-            for key in ['x-split-part', 'x-split-timestamp']:
-                if key in self.merged_spec['info']:
-                    del self.merged_spec['info'][key]
+            # Copy without the split indicators
+            self.merged_spec['info'] = {
+                key: value for key, value in source_info.items() if key not in _SPLIT_KEYS
+            }
             
             # Clean up title if it contains split suffix
             title = self.merged_spec['info'].get('title', '')
@@ -120,7 +376,7 @@ class OpenAPIMerger:
             
             # Merge extensions (x- fields) that don't conflict
             for key, value in source_info.items():
-                if key.startswith('x-') and key not in ['x-split-part', 'x-split-timestamp']:
+                if key.startswith('x-') and key not in _SPLIT_KEYS:
                     if key not in self.merged_spec['info']:
                         self.merged_spec['info'][key] = value
     
@@ -142,7 +398,11 @@ class OpenAPIMerger:
                 self.merged_spec[prop] = spec[prop].copy()
             elif prop == 'servers':
                 # Merge servers, avoiding duplicates
-                existing_servers = {json.dumps(s, sort_keys=True) for s in self.merged_spec[prop]}
+                existing_servers = self._server_keys
+                if existing_servers is None:
+                    existing_servers = self._server_keys = {
+                        json.dumps(s, sort_keys=True) for s in self.merged_spec[prop]
+                    }
                 for server in spec[prop]:
                     server_json = json.dumps(server, sort_keys=True)
                     if server_json not in existing_servers:
@@ -150,14 +410,19 @@ class OpenAPIMerger:
                         existing_servers.add(server_json)
             elif prop == 'tags':
                 # Merge tags, avoiding duplicates by name
-                existing_tags = {tag['name']: tag for tag in self.merged_spec[prop]}
+                existing_tags = self._tags_by_name
+                if existing_tags is None:
+                    existing_tags = self._tags_by_name = {tag['name']: tag for tag in self.merged_spec[prop]}
+                added = []
                 for tag in spec[prop]:
                     if tag['name'] not in existing_tags:
                         self.merged_spec[prop].append(tag)
+                        added.append(tag)
                     else:
                         # Update description if more detailed
                         if 'description' in tag and 'description' not in existing_tags[tag['name']]:
                             existing_tags[tag['name']]['description'] = tag['description']
+                existing_tags.update((tag['name'], tag) for tag in added)
     
     def merge_paths(self, spec: Dict[str, Any]) -> None:
         """
@@ -169,23 +434,31 @@ class OpenAPIMerger:
         if 'paths' not in spec:
             return
         
+        paths_out = self.merged_spec['paths']
+        paths_merged = operations_merged = path_conflicts = 0
+        
         for path, path_item in spec['paths'].items():
             if not isinstance(path_item, dict):
-                logger.warning(f"Invalid path item at {path}, skipping")
+                logger.warning("Invalid path item at %s, skipping", path)
                 continue
             
-            if path not in self.merged_spec['paths']:
-                self.merged_spec['paths'][path] = {}
-                self.stats['paths_merged'] += 1
+            dest = paths_out.get(path)
+            if dest is None:
+                dest = paths_out[path] = {}
+                paths_merged += 1
             
             for method, operation in path_item.items():
-                if method in self.merged_spec['paths'][path]:
-                    self.stats['path_conflicts'] += 1
-                    logger.warning(f"Duplicate operation: {method.upper()} {path}")
+                if method in dest:
+                    path_conflicts += 1
+                    logger.warning("Duplicate operation: %s %s", method.upper(), path)
                 
-                self.merged_spec['paths'][path][method] = operation
-                if method in ['get', 'post', 'put', 'delete', 'patch', 'options', 'head', 'trace']:
-                    self.stats['operations_merged'] += 1
+                dest[method] = operation
+                if method in _HTTP_METHODS:
+                    operations_merged += 1
+        
+        self.stats['paths_merged'] += paths_merged
+        self.stats['operations_merged'] += operations_merged
+        self.stats['path_conflicts'] += path_conflicts
     
     def merge_components(self, spec: Dict[str, Any], conflict_strategy: str = 'keep_first') -> None:
         """
@@ -208,15 +481,81 @@ class OpenAPIMerger:
         conflicts = ComponentExtractor.merge_components(
             target_components, 
             source_components, 
-            conflict_strategy
+            conflict_strategy,
+            fingerprint_cache=self._fingerprints
         )
         
         # Track conflicts in stats
+        conflict_stats = self.stats['component_conflicts']
         for comp_type, count in conflicts.items():
             if count > 0:
-                if comp_type not in self.stats['component_conflicts']:
-                    self.stats['component_conflicts'][comp_type] = 0
-                self.stats['component_conflicts'][comp_type] += count
+                conflict_stats[comp_type] = conflict_stats.get(comp_type, 0) + count
+    
+    def merge_spec(self, spec: Dict[str, Any], conflict_strategy: str = 'keep_first') -> None:
+        """
+        Merge every section of a loaded spec into the merged spec.
+        
+        Args:
+            spec: Spec to merge
+            conflict_strategy: How to handle component conflicts
+        """
+        if self.stats['files_processed'] == 0:
+            # First file - copy OpenAPI version
+            if 'openapi' in spec:
+                self.merged_spec['openapi'] = spec['openapi']
+            elif 'swagger' in spec:
+                self.merged_spec['swagger'] = spec['swagger']
+        
+        self.merge_info(spec)
+        self.merge_root_properties(spec)
+        self.merge_components(spec, conflict_strategy)
+        self.merge_paths(spec)
+    
+    def _should_stream(self, file_path: Path) -> bool:
+        """Whether a spec file is large enough to be streamed instead of loaded whole."""
+        return (
+            ijson is not None
+            and file_path.suffix == '.json'
+            and file_path.stat().st_size >= _STREAM_THRESHOLD
+        )
+    
+    def merge_streamed(self, file_path: Path, conflict_strategy: str = 'keep_first',
+                       validate: bool = True) -> None:
+        """
+        Merge a JSON spec file while parsing it, one path or component at a time.
+        
+        Only a single path item or component definition is materialized at once,
+        so peak memory doesn't include a full parsed copy of the file. The file
+        is first checked in a separate pass, so a malformed file leaves the
+        merged spec untouched.
+        
+        Args:
+            file_path: Path to the JSON spec file
+            conflict_strategy: How to handle component conflicts
+            validate: Check the file before merging; pass False only if the
+                caller already ran _check_streamed_spec on it
+            
+        Raises:
+            ijson.JSONError: If the file is not valid JSON
+            ValueError: If the root is not an object, or on conflicts with the 'error' strategy
+        """
+        # Small top-level sections (info, servers, tags, ...) are merged at the end
+        head = {}
+        
+        with open(file_path, 'rb') as f:
+            if validate:
+                _check_streamed_spec(f)
+                f.seek(0)
+            
+            for section, key, value in _iter_streamed_spec(f):
+                if section == 'paths':
+                    self.merge_paths({'paths': {key: value}})
+                elif section == 'components':
+                    self.merge_components({'components': {key: value}}, conflict_strategy)
+                else:
+                    head[key] = value
+        
+        self.merge_spec(head, conflict_strategy)
     
     def clean_merged_spec(self) -> None:
         """Clean up the merged specification."""
@@ -239,13 +578,17 @@ class OpenAPIMerger:
             logger.warning("Merged spec has no paths!")
     
     def merge_all(self, conflict_strategy: str = 'keep_first', 
-                  output_format: str = 'json') -> Dict[str, Any]:
+                  output_format: str = 'json', parallel: bool = True,
+                  fast_yaml: bool = False) -> Dict[str, Any]:
         """
         Merge all split files back into one.
         
         Args:
             conflict_strategy: How to handle conflicts
             output_format: Output format ('json' or 'yaml')
+            parallel: Parse the spec files concurrently, while merging them in order,
+                when they are large enough to benefit
+            fast_yaml: Write YAML output in JSON syntax when possible (see SpecLoader.save_spec)
             
         Returns:
             Statistics about the merge operation
@@ -259,29 +602,44 @@ class OpenAPIMerger:
         
         logger.info(f"Found {len(spec_files)} files to merge")
         
+        # Streamed files are parsed while merging; the rest can be parsed up front
+        streamed = {file_path for file_path in spec_files if self._should_stream(file_path)}
+        to_load = [file_path for file_path in spec_files if file_path not in streamed]
+        
+        if parallel and len(to_load) > 1 and _total_size(to_load) >= _PARALLEL_THRESHOLD:
+            parsed = _iter_spec_files(to_load)
+        else:
+            parsed = None
+        
         # Process each file
         for file_path in spec_files:
-            logger.info(f"Processing {file_path.name}...")
+            logger.info("Processing %s...", file_path.name)
             
-            try:
-                spec = SpecLoader.load_spec(file_path)
-            except Exception as e:
-                logger.error(f"Failed to load {file_path}: {e}")
+            if file_path in streamed:
+                # Reject malformed files before any of their contents are merged;
+                # errors from merging itself (e.g. conflicts) still propagate
+                try:
+                    with open(file_path, 'rb') as f:
+                        _check_streamed_spec(f)
+                except (OSError, ValueError, ijson.JSONError) as e:
+                    logger.error(f"Failed to load {file_path}: {e}")
+                    continue
+                
+                try:
+                    self.merge_streamed(file_path, conflict_strategy, validate=False)
+                except (OSError, ijson.JSONError) as e:
+                    logger.error(f"Failed to load {file_path}: {e}")
+                    continue
+                self.stats['files_processed'] += 1
                 continue
             
-            # Merge different sections
-            if self.stats['files_processed'] == 0:
-                # First file - copy OpenAPI version
-                if 'openapi' in spec:
-                    self.merged_spec['openapi'] = spec['openapi']
-                elif 'swagger' in spec:
-                    self.merged_spec['swagger'] = spec['swagger']
-            
-            self.merge_info(spec)
-            self.merge_root_properties(spec)
-            self.merge_components(spec, conflict_strategy)
-            self.merge_paths(spec)
+            # Parsed results arrive in the same order as to_load
+            spec, error = next(parsed) if parsed is not None else _load_spec_file(file_path)
+            if error is not None:
+                logger.error(f"Failed to load {file_path}: {error}")
+                continue
             
+            self.merge_spec(spec, conflict_strategy)
             self.stats['files_processed'] += 1
         
         # Clean up the merged spec
@@ -289,7 +647,8 @@ class OpenAPIMerger:
         
         # Save the merged spec
         logger.info(f"Saving merged spec to {self.output_path}")
-        SpecLoader.save_spec(self.merged_spec, self.output_path, format=output_format)
+        SpecLoader.save_spec(self.merged_spec, self.output_path, format=output_format,
+                             fast_yaml=fast_yaml)
         
         # Log statistics
         logger.info("Merge completed successfully!")
@@ -314,5 +673,4 @@ class OpenAPIMerger:
         Returns:
             List of validation issues
         """
-        from core import validate_spec_structure
         return validate_spec_structure(self.merged_spec)
\ No newline at end of file
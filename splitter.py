@@ -1,27 +1,92 @@
 """OpenAPI specification splitter module."""
 
-import json
+import sys
+from collections import deque
+from itertools import count, islice
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
-from collections import defaultdict
+from typing import Dict, Any, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
-from core import SpecLoader, ComponentExtractor, OperationCounter, logger
+from core import SpecLoader, ComponentExtractor, OperationCounter, encode_json, logger
+
+# Strips path parameter braces from path prefixes used in filenames
+_BRACE_TRANS = str.maketrans('', '', '{}')
+
+# Replaces path separators and spaces when turning tags into filenames
+_FN_TRANS = str.maketrans({'/': '_', ' ': '_'})
+
+_COMPONENT_REF_PREFIX = '#/components/'
+
+# Most split files being built or written at once, bounding the operations held in memory
+_EMIT_WINDOW = 16
+
+
+def _add_ref(refs: Set[Tuple[str, str]], ref: Any) -> None:
+    """Add the component a reference string points to, if it is a local component reference."""
+    if isinstance(ref, str) and ref.startswith(_COMPONENT_REF_PREFIX):
+        # '#/components/<type>/<name>[/...]', name JSON-pointer escaped
+        parts = ref[len(_COMPONENT_REF_PREFIX):].split('/', 2)
+        if len(parts) >= 2:
+            refs.add((parts[0], parts[1].replace('~1', '/').replace('~0', '~')))
+
+
+def _collect_refs(obj: Any) -> Set[Tuple[str, str]]:
+    """
+    Find the components referenced anywhere inside an object.
+    
+    Args:
+        obj: Part of an OpenAPI spec (operation, component definition, ...)
+        
+    Returns:
+        Set of (component type, component name) pairs referenced via $ref
+        or a discriminator mapping
+    """
+    refs = set()
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            _add_ref(refs, value.get('$ref'))
+            
+            # Discriminator mappings name their target schemas without a $ref,
+            # either as a reference string or as a bare schema name
+            discriminator = value.get('discriminator')
+            if isinstance(discriminator, dict):
+                mapping = discriminator.get('mapping')
+                if isinstance(mapping, dict):
+                    for target in mapping.values():
+                        if isinstance(target, str) and not target.startswith('#'):
+                            refs.add(('schemas', target))
+                        else:
+                            _add_ref(refs, target)
+            
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return refs
 
 
 class OpenAPISplitter:
     """Split large OpenAPI specs into manageable chunks while preserving references."""
     
-    def __init__(self, spec_path: str, output_dir: str = "split_specs"):
+    def __init__(self, spec_path: str, output_dir: str = "split_specs",
+                 prune_components: bool = False):
         """
         Initialize the OpenAPI splitter.
         
         Args:
             spec_path: Path to the OpenAPI specification file
             output_dir: Directory to output split files
+            prune_components: Only include the components each split file's
+                operations reference (directly or transitively) instead of all
+                of them. Components nothing references are then left out of
+                every file, so they won't survive a split and merge.
         """
         self.spec_path = Path(spec_path)
+        self._spec_path_str = str(self.spec_path)
         self.output_dir = Path(output_dir)
+        self.prune_components = prune_components
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Load the spec with error handling
@@ -33,6 +98,40 @@ class OpenAPISplitter:
         
         # Extract common components
         self.common_components = ComponentExtractor.extract_components(self.spec)
+        
+        # Path items that can hold operations, validated once for all groupings
+        self._valid_paths: List[Tuple[str, Dict[str, Any]]] = []
+        for path, path_item in (self.spec.get('paths') or {}).items():
+            if isinstance(path_item, dict):
+                self._valid_paths.append((path, path_item))
+            else:
+                logger.warning("Invalid path item at %s, skipping", path)
+        
+        # Parts shared by every mini spec, computed once. Mini specs reference
+        # these rather than copying them, so they must not be mutated.
+        self._shared_components = {
+            comp_type: components
+            for comp_type, components in self.common_components.items()
+            if components
+        }
+        self._info_base = self.spec['info'] if 'info' in self.spec else {'title': 'API', 'version': '1.0.0'}
+        self._mtime = self.spec_path.stat().st_mtime
+        
+        # "components" member of the mini spec JSON, encoded when first splitting
+        self._components_json: Optional[bytes] = None
+        
+        # Components each component references directly, filled in while pruning
+        self._component_refs: Dict[Tuple[str, str], FrozenSet[Tuple[str, str]]] = {}
+        
+        # Results of walking the paths, computed on first use
+        self._op_counts: Optional[Dict[str, int]] = None
+        self._tag_groups: Optional[Dict[str, List[Tuple[str, str, Dict]]]] = None
+        
+        # Position of each declared tag in spec['tags'], by name
+        self._tag_positions: Dict[str, int] = {}
+        for i, tag in enumerate(self.spec.get('tags') or ()):
+            if isinstance(tag, dict) and 'name' in tag:
+                self._tag_positions.setdefault(tag['name'], i)
     
     def analyze_spec(self) -> Dict[str, Any]:
         """
@@ -41,20 +140,23 @@ class OpenAPISplitter:
         Returns:
             Dictionary with analysis results
         """
-        operation_counts = OperationCounter.count_operations(self.spec)
+        if self._op_counts is None:
+            self._op_counts = OperationCounter.count_operations(self.spec)
+        operation_counts = self._op_counts
+        components = self.spec.get('components') or {}
         
         analysis = {
-            'total_endpoints': len(self.spec.get('paths', {})),
+            'total_endpoints': len(self.spec.get('paths') or {}),
             'total_operations': operation_counts['total'],
             'operations_by_method': {
                 method: count 
                 for method, count in operation_counts.items() 
                 if method != 'total' and count > 0
             },
-            'total_schemas': len(self.spec.get('components', {}).get('schemas', {})),
-            'total_responses': len(self.spec.get('components', {}).get('responses', {})),
-            'total_parameters': len(self.spec.get('components', {}).get('parameters', {})),
-            'has_security': 'security' in self.spec or 'securitySchemes' in self.spec.get('components', {}),
+            'total_schemas': len(components.get('schemas') or ()),
+            'total_responses': len(components.get('responses') or ()),
+            'total_parameters': len(components.get('parameters') or ()),
+            'has_security': 'security' in self.spec or 'securitySchemes' in components,
             'has_servers': 'servers' in self.spec,
             'openapi_version': self.spec.get('openapi', self.spec.get('swagger', 'unknown'))
         }
@@ -65,33 +167,38 @@ class OpenAPISplitter:
         """
         Group endpoints by their tags for logical splitting.
         
+        The grouping is computed once per splitter and shared between calls.
+        
         Returns:
             Dictionary mapping tags to list of (path, method, operation) tuples
         """
-        grouped = defaultdict(list)
+        if self._tag_groups is not None:
+            return self._tag_groups
+        
+        grouped = {}
         untagged = []
+        methods = OperationCounter.HTTP_METHODS_SET
         
-        for path, path_item in self.spec.get('paths', {}).items():
-            if not isinstance(path_item, dict):
-                logger.warning(f"Invalid path item at {path}, skipping")
-                continue
-            
+        for path, path_item in self._valid_paths:
             # Track if any operation in this path has been tagged
             path_has_tags = False
             
-            for method in OperationCounter.HTTP_METHODS:
-                if method not in path_item:
+            # Operations in document order, skipping parameters, summary, etc.
+            for method, operation in path_item.items():
+                if method not in methods:
                     continue
-                    
-                operation = path_item[method]
+                
                 if not isinstance(operation, dict):
-                    logger.warning(f"Invalid operation at {method.upper()} {path}, skipping")
+                    logger.warning("Invalid operation at %s %s, skipping", method.upper(), path)
                     continue
                 
-                tags = operation.get('tags', [])
+                tags = operation.get('tags') or ()
                 if tags:
                     for tag in tags:
-                        grouped[tag].append((path, method, operation))
+                        # Tags repeat across many operations; share one string per name
+                        if type(tag) is str:
+                            tag = sys.intern(tag)
+                        grouped.setdefault(tag, []).append((path, method, operation))
                         path_has_tags = True
                 else:
                     # Collect untagged operations
@@ -100,7 +207,8 @@ class OpenAPISplitter:
         if untagged:
             grouped['untagged'] = untagged
         
-        return dict(grouped)
+        self._tag_groups = grouped
+        return grouped
     
     def group_endpoints_by_path_prefix(self, max_per_file: int = 50) -> Dict[str, List[Tuple[str, str, Dict]]]:
         """
@@ -112,24 +220,21 @@ class OpenAPISplitter:
         Returns:
             Dictionary mapping prefixes to list of (path, method, operation) tuples
         """
-        grouped = defaultdict(list)
+        grouped = {}
+        methods = OperationCounter.HTTP_METHODS_SET
         
-        for path, path_item in self.spec.get('paths', {}).items():
-            if not isinstance(path_item, dict):
-                continue
-            
+        for path, path_item in self._valid_paths:
             # Extract the first significant part of the path
-            parts = path.strip('/').split('/')
-            prefix = parts[0] if parts and parts[0] else 'root'
+            prefix = path.lstrip('/').partition('/')[0] or 'root'
             
             # Sanitize prefix for filename
-            prefix = prefix.replace('{', '').replace('}', '')
+            if '{' in prefix or '}' in prefix:
+                prefix = prefix.translate(_BRACE_TRANS)
+            prefix = sys.intern(prefix)
             
-            for method in OperationCounter.HTTP_METHODS:
-                if method in path_item:
-                    operation = path_item[method]
-                    if isinstance(operation, dict):
-                        grouped[prefix].append((path, method, operation))
+            for method, operation in path_item.items():
+                if method in methods and isinstance(operation, dict):
+                    grouped.setdefault(prefix, []).append((path, method, operation))
         
         # Split large groups into smaller chunks
         final_groups = {}
@@ -144,7 +249,7 @@ class OpenAPISplitter:
         return final_groups
     
     def create_mini_spec(self, endpoints: List[Tuple[str, str, Dict]], 
-                        name: str, include_components: bool = True) -> Dict[str, Any]:
+                        name: str, include_components: bool = True) -> Tuple[Dict[str, Any], int]:
         """
         Create a mini OpenAPI spec with selected endpoints.
         
@@ -154,55 +259,205 @@ class OpenAPISplitter:
             include_components: Whether to include shared components
             
         Returns:
-            Dictionary containing the mini specification
+            Tuple of the mini specification and its number of distinct paths;
+            components, servers and security are shared with the source spec,
+            not copied
         """
+        info_base = self._info_base
+        
         mini_spec = {
             'openapi': self.spec.get('openapi', '3.1.0'),
-            'info': self.spec.get('info', {}).copy() if 'info' in self.spec else {'title': 'API', 'version': '1.0.0'},
+            # Mark this as a split
+            'info': {
+                **info_base,
+                'title': f"{info_base.get('title', 'API')} - {name}",
+                'x-split-part': name,
+                'x-split-timestamp': self._mtime
+            },
             'paths': {}
         }
         
         # Include components if requested
-        if include_components and self.common_components:
-            mini_spec['components'] = {}
-            for comp_type, components in self.common_components.items():
-                if components:
-                    mini_spec['components'][comp_type] = components
+        if include_components:
+            if self.prune_components:
+                mini_spec['components'] = self._referenced_components(endpoints)
+            else:
+                mini_spec['components'] = self._shared_components
         
         # Add servers if present
         if 'servers' in self.spec:
-            mini_spec['servers'] = self.spec['servers'].copy()
+            mini_spec['servers'] = self.spec['servers']
         
         # Add security if present
         if 'security' in self.spec:
-            mini_spec['security'] = self.spec['security'].copy()
+            mini_spec['security'] = self.spec['security']
         
         # Add relevant tags
         if 'tags' in self.spec:
             # Filter tags to only include those used in the endpoints
-            used_tags = set()
-            for _, _, operation in endpoints:
-                if 'tags' in operation:
-                    used_tags.update(operation['tags'])
+            used_tags = {tag for _, _, operation in endpoints for tag in operation.get('tags') or ()}
             
             if used_tags:
-                mini_spec['tags'] = [
-                    tag for tag in self.spec['tags'] 
-                    if tag.get('name') in used_tags
-                ]
+                # Keep the order the tags are declared in
+                tag_positions = self._tag_positions
+                positions = sorted(tag_positions[tag] for tag in used_tags if tag in tag_positions)
+                spec_tags = self.spec['tags']
+                mini_spec['tags'] = [spec_tags[i] for i in positions]
         
         # Add the endpoints
+        paths_out = mini_spec['paths']
         for path, method, operation in endpoints:
-            if path not in mini_spec['paths']:
-                mini_spec['paths'][path] = {}
-            mini_spec['paths'][path][method] = operation
+            paths_out.setdefault(path, {})[method] = operation
+        
+        return mini_spec, len(paths_out)
+    
+    def _referenced_components(self, endpoints: List[Tuple[str, str, Dict]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Select the components a set of endpoints needs.
+        
+        Follows $refs from the operations through the components they reach.
+        Security schemes are always kept, since security requirements name them
+        without a $ref.
+        
+        Args:
+            endpoints: List of (path, method, operation) tuples
+            
+        Returns:
+            Component types and definitions, in the source spec's order
+        """
+        common = self.common_components
+        component_refs = self._component_refs
+        
+        pending = list(_collect_refs([operation for _, _, operation in endpoints]))
+        needed = set()
+        while pending:
+            ref = pending.pop()
+            if ref in needed:
+                continue
+            comp_type, name = ref
+            items = common.get(comp_type)
+            if not items or name not in items:
+                continue  # dangling or non-component reference
+            needed.add(ref)
+            
+            direct = component_refs.get(ref)
+            if direct is None:
+                direct = component_refs[ref] = frozenset(_collect_refs(items[name]))
+            pending.extend(direct - needed)
+        
+        components = {}
+        for comp_type, items in self._shared_components.items():
+            if comp_type == 'securitySchemes':
+                components[comp_type] = items
+                continue
+            selected = {name: definition for name, definition in items.items() if (comp_type, name) in needed}
+            if selected:
+                components[comp_type] = selected
+        
+        return components
+    
+    def _encode_mini_spec(self, mini_spec: Dict[str, Any]) -> bytes:
+        """
+        Encode a mini spec built without components as indented JSON.
         
-        # Update info to indicate this is a split
-        mini_spec['info']['title'] = f"{mini_spec['info'].get('title', 'API')} - {name}"
-        mini_spec['info']['x-split-part'] = name
-        mini_spec['info']['x-split-timestamp'] = Path(self.spec_path).stat().st_mtime
+        The shared components, encoded once, are spliced in after the paths,
+        so the result matches encoding the mini spec with its components.
         
-        return mini_spec
+        Args:
+            mini_spec: Mini spec from create_mini_spec(..., include_components=False)
+            
+        Returns:
+            The encoded JSON document
+        """
+        # Each top-level member is encoded on its own: encoding {key: value}
+        # gives '{\n  "key": value\n}', and the member is the text in between
+        members = []
+        for key, value in mini_spec.items():
+            members.append(encode_json({key: value})[2:-2])
+            if key == 'paths':
+                members.append(self._components_json)
+        
+        return b'{\n' + b',\n'.join(members) + b'\n}'
+    
+    def _emit(self, filename: str, endpoints: List[Tuple[str, str, Dict]],
+              name: str, details: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create and save one split file.
+        
+        Args:
+            filename: Name of the file to write in the output directory
+            endpoints: List of (path, method, operation) tuples
+            name: Name for this split
+            details: Extra mapping fields describing the split (tag, prefix or part)
+            
+        Returns:
+            Mapping entry for the written file
+        """
+        if self.prune_components:
+            # Each file has its own components, so there is nothing to reuse
+            mini_spec, path_count = self.create_mini_spec(endpoints, name)
+            data = encode_json(mini_spec)
+        else:
+            mini_spec, path_count = self.create_mini_spec(endpoints, name, include_components=False)
+            data = self._encode_mini_spec(mini_spec)
+        (self.output_dir / filename).write_bytes(data)
+        
+        return {
+            'name': filename,
+            **details,
+            'endpoint_count': len(endpoints),
+            'path_count': path_count
+        }
+    
+    def _emit_all(self, jobs: Iterable[Tuple[str, List[Tuple[str, str, Dict]], str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Create and save split files concurrently.
+        
+        Encoding and writing one file overlaps with the others; the mapping
+        entries and log lines still come out in job order. Jobs are taken from
+        the iterable only as earlier files finish, so at most _EMIT_WINDOW
+        of them are pending at once.
+        
+        Args:
+            jobs: Arguments for _emit, one tuple per file
+            
+        Returns:
+            Mapping entries in the same order as the jobs
+        """
+        # Encode the shared components once, before the workers need them
+        if not self.prune_components and self._components_json is None:
+            self._components_json = encode_json({'components': self._shared_components})[2:-2]
+        
+        files = []
+        
+        def collect(future):
+            entry = future.result()
+            logger.info("  Created %s with %d operations", entry['name'], entry['endpoint_count'])
+            files.append(entry)
+        
+        with ThreadPoolExecutor() as ex:
+            pending = deque()
+            for job in jobs:
+                pending.append(ex.submit(self._emit, *job))
+                if len(pending) >= _EMIT_WINDOW:
+                    collect(pending.popleft())
+            
+            while pending:
+                collect(pending.popleft())
+        
+        return files
+    
+    def _write_mapping(self, mapping: Dict[str, Any]) -> None:
+        """
+        Save the split mapping next to the split files.
+        
+        The merger reads it back from split_mapping.json to find the files in
+        order, so the name is the same for every split method.
+        
+        Args:
+            mapping: Mapping information about the split files
+        """
+        (self.output_dir / 'split_mapping.json').write_bytes(encode_json(mapping))
     
     def split_by_tags(self) -> Dict[str, Any]:
         """
@@ -218,31 +473,19 @@ class OpenAPISplitter:
             logger.warning("No endpoints found to split")
             return {'type': 'tag-based', 'files': []}
         
-        mapping = {'type': 'tag-based', 'files': [], 'source': str(self.spec_path)}
+        mapping = {'type': 'tag-based', 'files': [], 'source': self._spec_path_str}
         
+        jobs = []
         for tag, endpoints in grouped.items():
             # Sanitize tag for filename
-            safe_tag = tag.replace('/', '_').replace(' ', '_')
-            filename = f"spec_{safe_tag}.json"
-            mini_spec = self.create_mini_spec(endpoints, tag)
-            
-            output_path = self.output_dir / filename
-            SpecLoader.save_spec(mini_spec, output_path, format='json')
-            
-            mapping['files'].append({
-                'name': filename,
-                'tag': tag,
-                'endpoint_count': len(endpoints),
-                'path_count': len(set(path for path, _, _ in endpoints))
-            })
-            logger.info(f"  Created {filename} with {len(endpoints)} operations")
-        
-        # Save mapping
-        mapping_path = self.output_dir / 'split_mapping.json'
-        with open(mapping_path, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, indent=2)
-        
-        logger.info(f"Split into {len(grouped)} files")
+            safe_tag = tag.translate(_FN_TRANS)
+            jobs.append((f"spec_{safe_tag}.json", endpoints, tag, {'tag': tag}))
+        
+        mapping['files'] = self._emit_all(jobs)
+        
+        self._write_mapping(mapping)
+        
+        logger.info("Split into %d files", len(grouped))
         return mapping
     
     def split_by_path_prefix(self, max_per_file: int = 50) -> Dict[str, Any]:
@@ -262,31 +505,39 @@ class OpenAPISplitter:
             logger.warning("No endpoints found to split")
             return {'type': 'path-based', 'files': []}
         
-        mapping = {'type': 'path-based', 'files': [], 'source': str(self.spec_path)}
+        mapping = {'type': 'path-based', 'files': [], 'source': self._spec_path_str}
         
-        for prefix, endpoints in grouped.items():
-            filename = f"spec_{prefix}.json"
-            mini_spec = self.create_mini_spec(endpoints, prefix)
-            
-            output_path = self.output_dir / filename
-            SpecLoader.save_spec(mini_spec, output_path, format='json')
-            
-            mapping['files'].append({
-                'name': filename,
-                'prefix': prefix,
-                'endpoint_count': len(endpoints),
-                'path_count': len(set(path for path, _, _ in endpoints))
-            })
-            logger.info(f"  Created {filename} with {len(endpoints)} operations")
-        
-        # Save mapping
-        mapping_path = self.output_dir / 'split_mapping.json'
-        with open(mapping_path, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, indent=2)
-        
-        logger.info(f"Split into {len(grouped)} files")
+        jobs = [
+            (f"spec_{prefix}.json", endpoints, prefix, {'prefix': prefix})
+            for prefix, endpoints in grouped.items()
+        ]
+        
+        mapping['files'] = self._emit_all(jobs)
+        
+        self._write_mapping(mapping)
+        
+        logger.info("Split into %d files", len(grouped))
         return mapping
     
+    def _size_jobs(self, operations_per_file: int) -> Iterator[Tuple[str, List[Tuple[str, str, Dict]], str, Dict[str, Any]]]:
+        """
+        Generate _emit arguments for size-based split files, one chunk at a time.
+        
+        Operations are chunked as they are read, rather than slicing a full list.
+        
+        Args:
+            operations_per_file: Number of operations per file
+            
+        Yields:
+            Arguments for _emit, one tuple per file
+        """
+        operations = OperationCounter.iter_operations(self.spec)
+        for part_num in count(1):
+            chunk = list(islice(operations, operations_per_file))
+            if not chunk:
+                return
+            yield f"spec_part{part_num:03d}.json", chunk, f"Part {part_num}", {'part': part_num}
+    
     def split_by_size(self, operations_per_file: int = 30) -> Dict[str, Any]:
         """
         Split the spec into files with a fixed number of operations.
@@ -299,37 +550,18 @@ class OpenAPISplitter:
         """
         logger.info(f"Splitting into files with ~{operations_per_file} operations each...")
         
-        all_endpoints = OperationCounter.get_operations(self.spec)
+        if operations_per_file < 1:
+            raise ValueError("operations_per_file must be at least 1")
+        
+        files = self._emit_all(self._size_jobs(operations_per_file))
         
-        if not all_endpoints:
+        if not files:
             logger.warning("No endpoints found to split")
             return {'type': 'size-based', 'files': []}
         
-        mapping = {'type': 'size-based', 'files': [], 'source': str(self.spec_path)}
+        mapping = {'type': 'size-based', 'files': files, 'source': self._spec_path_str}
         
-        for i in range(0, len(all_endpoints), operations_per_file):
-            chunk = all_endpoints[i:i + operations_per_file]
-            part_num = (i // operations_per_file) + 1
-            filename = f"spec_part{part_num:03d}.json"
-            
-            mini_spec = self.create_mini_spec(chunk, f"Part {part_num}")
-            
-            output_path = self.output_dir / filename
-            SpecLoader.save_spec(mini_spec, output_path, format='json')
-            
-            mapping['files'].append({
-                'name': filename,
-                'part': part_num,
-                'endpoint_count': len(chunk),
-                'path_count': len(set(path for path, _, _ in chunk))
-            })
-            logger.info(f"  Created {filename} with {len(chunk)} operations")
-        
-        # Save mapping
-        mapping_path = self.output_dir / 'split_mapping.json'
-        with open(mapping_path, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, indent=2)
-        
-        total_files = (len(all_endpoints) + operations_per_file - 1) // operations_per_file
-        logger.info(f"Split into {total_files} files")
+        self._write_mapping(mapping)
+        
+        logger.info("Split into %d files", len(mapping['files']))
         return mapping
\ No newline at end of file